@@ -0,0 +1,143 @@
+"""
+RepoGif - Command line interface.
+
+Running ``repogif`` without a command generates the default GIF, as before.
+Subcommands expose the render queue and template development tools:
+
+    repogif enqueue --queue sqlite:///jobs.db jobs.json
+    repogif worker --queue sqlite:///jobs.db
+    repogif status --queue sqlite:///jobs.db
+    repogif retry-dead --queue sqlite:///jobs.db
+    repogif watch --out-dir previews
+"""
+
+import sys
+import json
+import argparse
+
+from .generator import generate_repo_gif
+
+
+def _add_queue_options(parser):
+    parser.add_argument("--queue", required=True,
+                        help="Queue URL: sqlite:///path/to/queue.db or redis://host:port/db")
+    parser.add_argument("--visibility-timeout", type=float, default=300,
+                        help="Seconds before a leased job is handed to another worker (default: 300)")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                        help="Attempts before a job is dead-lettered (default: 3)")
+
+
+def _open_queue(args):
+    from .render_queue import open_queue
+    return open_queue(args.queue,
+                      visibility_timeout=args.visibility_timeout,
+                      max_attempts=args.max_attempts)
+
+
+def _cmd_enqueue(args):
+    with open(args.jobs, encoding="utf-8") as f:
+        jobs = json.load(f)
+    if isinstance(jobs, dict):
+        jobs = [jobs]
+    queue = _open_queue(args)
+    for params in jobs:
+        key = queue.enqueue(params)
+        print(f"Enqueued {key[:12]} -> {params.get('out', 'repo.gif')}")
+    queue.close()
+
+
+def _cmd_worker(args):
+    from .render_queue import RenderWorker
+    queue = _open_queue(args)
+    worker = RenderWorker(queue, worker_id=args.worker_id, poll_interval=args.poll_interval)
+    try:
+        processed = worker.run(max_jobs=args.max_jobs, exit_when_empty=args.exit_when_empty)
+        print(f"✅ Worker {worker.worker_id} processed {processed} job(s)")
+    except KeyboardInterrupt:
+        print(f"Worker {worker.worker_id} stopped")
+    finally:
+        queue.close()
+
+
+def _cmd_status(args):
+    queue = _open_queue(args)
+    for status, count in sorted(queue.stats().items()):
+        print(f"{status}: {count}")
+    for key, params, error in queue.dead_letters():
+        print(f"dead {key[:12]} -> {params.get('out', 'repo.gif')}: {error}")
+    queue.close()
+
+
+def _cmd_retry_dead(args):
+    queue = _open_queue(args)
+    print(f"Requeued {queue.requeue_dead()} dead-lettered job(s)")
+    queue.close()
+
+
+def _cmd_watch(args):
+    from .watch import TemplateWatcher
+    try:
+        watcher = TemplateWatcher(samples_path=args.samples, out_dir=args.out_dir,
+                                  templates=args.template, interval=args.interval)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error: {e}")
+    try:
+        watcher.run(once=args.once)
+    except RuntimeError as e:
+        sys.exit(f"Error: {e}")
+
+
+def build_parser():
+    """Returns the argument parser for the ``repogif`` command."""
+    parser = argparse.ArgumentParser(prog="repogif",
+                                     description="Generate GitHub repository header GIFs.")
+    commands = parser.add_subparsers(dest="command")
+
+    enqueue = commands.add_parser("enqueue", help="Add render jobs to a queue")
+    _add_queue_options(enqueue)
+    enqueue.add_argument("jobs", help="JSON file with a job (or list of jobs) of generate_repo_gif arguments")
+    enqueue.set_defaults(func=_cmd_enqueue)
+
+    worker = commands.add_parser("worker", help="Render jobs from a queue")
+    _add_queue_options(worker)
+    worker.add_argument("--worker-id", help="Name shown in log output (default: host:pid)")
+    worker.add_argument("--poll-interval", type=float, default=1.0,
+                        help="Seconds to wait when the queue is empty (default: 1)")
+    worker.add_argument("--max-jobs", type=int, help="Exit after this many jobs")
+    worker.add_argument("--exit-when-empty", action="store_true",
+                        help="Exit once no job is available instead of polling")
+    worker.set_defaults(func=_cmd_worker)
+
+    status = commands.add_parser("status", help="Show job counts and dead-lettered jobs")
+    _add_queue_options(status)
+    status.set_defaults(func=_cmd_status)
+
+    retry_dead = commands.add_parser("retry-dead", help="Requeue dead-lettered jobs with fresh attempts")
+    _add_queue_options(retry_dead)
+    retry_dead.set_defaults(func=_cmd_retry_dead)
+
+    watch = commands.add_parser("watch", help="Re-render template previews whenever a template changes")
+    watch.add_argument("--samples", default=None,
+                       help="Sample manifest JSON (default: repogif/templates/samples.json)")
+    watch.add_argument("--out-dir", default="previews", help="Directory for previews (default: previews)")
+    watch.add_argument("--template", action="append",
+                       help="Only watch this template (can be repeated)")
+    watch.add_argument("--interval", type=float, default=0.2,
+                       help="Seconds between checks for changes (default: 0.2)")
+    watch.add_argument("--once", action="store_true", help="Render all previews once and exit")
+    watch.set_defaults(func=_cmd_watch)
+
+    return parser
+
+
+def main(argv=None):
+    """Entry point for the ``repogif`` command."""
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    if args.command is None:
+        generate_repo_gif()
+        return
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ header GIFs using customizable templates.
 """
 
 import os
+import time
 import tempfile
 import shutil
 import importlib
@@ -13,6 +14,23 @@ from pathlib import Path
 from PIL import Image
 
 
+# Animation formats supported for variants, mapped to their PIL format names
+_ANIMATION_FORMATS = {
+    "gif": "GIF",
+    "png": "PNG",
+    "webp": "WEBP"
+}
+
+# Lets templates start their delayed transitions (template8 starts its bars 50ms
+# after load), then waits for every finite animation to finish
+_SETTLE_ANIMATIONS = """async () => {
+    await new Promise(resolve => setTimeout(resolve, 100));
+    await Promise.all(document.getAnimations()
+        .filter(animation => animation.effect.getComputedTiming().endTime !== Infinity)
+        .map(animation => animation.finished.catch(() => {})));
+}"""
+
+
 class RepoGifGenerator:
     """
     Template-based GitHub repository header GIF generator.
@@ -20,8 +38,17 @@ class RepoGifGenerator:
     using various templates.
     """
     
-    def __init__(self):
-        """Initialize the generator with available templates."""
+    def __init__(self, templates_dir=None):
+        """
+        Initialize the generator with available templates.
+        
+        Args:
+            templates_dir (str, optional): Directory containing the template directories.
+                                         Defaults to the templates shipped with the package.
+        """
+        self.templates_dir = templates_dir or os.path.join(os.path.dirname(__file__), "templates")
+        # Seconds spent in each stage of the most recent generate_gif call
+        self.last_timings = {}
         self.templates = {
             "template1": "repogif.templates.template1",
             "template2": "repogif.templates.template2",
@@ -50,7 +77,9 @@ class RepoGifGenerator:
                      width=580,
                      height=140,
                      contributors=None,
-                     commits=None):
+                     commits=None,
+                     variants=None,
+                     browser=None):
         """
         Generate a GitHub repository header GIF using the specified template.
         
@@ -72,12 +101,19 @@ class RepoGifGenerator:
                                        Each contributor should have 'date', 'login', and 'avatar_url'.
             commits (str, optional): Comma-separated string of weekly commit counts for template8.
                                   Example: "10,25,15,30,20,35,40"
+            variants (list, optional): List of (width, height, scale, format) tuples to render in a
+                                    single browser session instead of the single width x height GIF.
+                                    Format is one of "gif", "png" (animated PNG) or "webp".
+                                    Each output is written next to `out` as e.g. "repo_1200x630@2x.png".
+            browser (optional): An already launched Playwright browser to render with. It is left
+                              open, so callers rendering many GIFs can keep a warm browser.
             
         Returns:
-            None: The GIF is saved to the specified path
+            None/list: None when `variants` is not given, otherwise the list of output paths
+                       in the order of `variants`
             
         Raises:
-            ValueError: If the specified template is not available
+            ValueError: If the specified template is not available or a variant is invalid
             RuntimeError: If required dependencies are not available
         """
         # Choose template (use default if not specified)
@@ -87,6 +123,13 @@ class RepoGifGenerator:
             available = ", ".join(self.get_available_templates())
             raise ValueError(f"Template '{template_name}' not found. Available templates: {available}")
         
+        # Resolve the outputs to render (a single GIF unless variants are requested)
+        if variants is None:
+            renders = [{"width": width, "height": height, "scale": 1, "format": "gif",
+                        "out": out, "tag": ""}]
+        else:
+            renders = self._resolve_variants(out, variants)
+        
         # Import the template
         try:
             from playwright.sync_api import sync_playwright
@@ -99,75 +142,78 @@ class RepoGifGenerator:
         
         # Get the template path
         template_module = self.templates[template_name]
-        template_dir = os.path.join(os.path.dirname(__file__), 
-                                   "templates", 
-                                   template_name)
+        template_dir = os.path.join(self.templates_dir, template_name)
         template_path = os.path.join(template_dir, "template.html")
         template_url = f"file://{os.path.abspath(template_path)}"
         
         # Create temporary directory for frames
         with tempfile.TemporaryDirectory() as temp_dir:
             try:
-                # File paths for the two states
-                unstarred_path = os.path.join(temp_dir, "unstarred.png")
-                starred_path = os.path.join(temp_dir, "starred.png")
+                # File paths for the two states of every render
+                for render in renders:
+                    render["frames"] = [
+                        os.path.join(temp_dir, f"unstarred{render['tag']}.png"),
+                        os.path.join(temp_dir, f"starred{render['tag']}.png")
+                    ]
+                
+                params = {
+                    "repo_name": repo_name,
+                    "stars": stars,
+                    "forks": forks,
+                    "starred": "false",
+                    "show_forks": "true" if show_forks else "false",
+                    "width": width,
+                    "height": height
+                }
+                
+                # Add commits data for template8
+                if commits and template_name == "template8":
+                    params["commits"] = commits
+                
+                # Add contributors data for template9
+                if contributors and template_name == "template9":
+                    params["contributors"] = contributors
+                    params["animation_state"] = "initial"
+                
+                starred_params = dict(params, starred="true")
+                
+                # Update animation state for template9
+                if contributors and template_name == "template9":
+                    starred_params["animation_state"] = "animated"
+                
+                states = [("unstarred", params), ("starred", starred_params)]
                 
                 print("Capturing screenshots with Playwright...")
-                with sync_playwright() as p:
-                    browser = p.chromium.launch()
-                    # Set viewport to the specified dimensions
-                    page = browser.new_page(viewport={"width": width, "height": height})
-                    
-                    # Capture unstarred state
-                    print("Capturing unstarred state...")
-                    params = {
-                        "repo_name": repo_name,
-                        "stars": stars,
-                        "forks": forks,
-                        "starred": "false",
-                        "show_forks": "true" if show_forks else "false",
-                        "width": width,
-                        "height": height
-                    }
-                    
-                    # Add commits data for template8
-                    if commits and template_name == "template8":
-                        params["commits"] = commits
-                    
-                    # Add contributors data for template9
-                    if contributors and template_name == "template9":
-                        params["contributors"] = contributors
-                        params["animation_state"] = "initial"
-                    query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-                    page.goto(f"{template_url}?{query_string}")
-                    page.screenshot(path=unstarred_path)
-                    
-                    # Capture starred state
-                    print("Capturing starred state...")
-                    params["starred"] = "true"
-                    
-                    # Update animation state for template9
-                    if contributors and template_name == "template9":
-                        params["animation_state"] = "animated"
-                        
-                    query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-                    page.goto(f"{template_url}?{query_string}")
-                    page.screenshot(path=starred_path)
-                    
-                    browser.close()
+                self.last_timings = {}
+                if browser is not None:
+                    started = time.perf_counter()
+                    self._capture_frames(browser, template_url, states, renders)
+                    self.last_timings["capture"] = time.perf_counter() - started
+                else:
+                    with sync_playwright() as p:
+                        started = time.perf_counter()
+                        launched = p.chromium.launch()
+                        self.last_timings["launch"] = time.perf_counter() - started
+                        started = time.perf_counter()
+                        self._capture_frames(launched, template_url, states, renders)
+                        self.last_timings["capture"] = time.perf_counter() - started
+                        launched.close()
                 
-                # Create GIF from the two frames using PIL
+                # Create the animations from the two frames using PIL
                 print("Creating GIF from screenshots...")
-                frames = [Image.open(unstarred_path), Image.open(starred_path)]
-                frames[0].save(
-                    out,
-                    format='GIF',
-                    append_images=[frames[1]],
-                    save_all=True,
-                    duration=1000,  # 1 second per frame
-                    loop=0  # Loop forever
-                )
-                print(f"✅ Saved {out}")
+                started = time.perf_counter()
+                for render in renders:
+                    frames = [Image.open(frame) for frame in render["frames"]]
+                    frames[0].save(
+                        render["out"],
+                        format=_ANIMATION_FORMATS[render["format"]],
+                        append_images=[frames[1]],
+                        save_all=True,
+                        duration=1000,  # 1 second per frame
+                        loop=0  # Loop forever
+                    )
+                    print(f"✅ Saved {render['out']}")
+                self.last_timings["encode"] = time.perf_counter() - started
                 
                 # Handle debug frames if debug_dir is provided
                 if debug_dir is not None and debug_dir is not False:
@@ -185,12 +231,10 @@ class RepoGifGenerator:
                             print(f"Created debug directory: {debug_dir}")
                         
                         # Copy frames to the debug directory
-                        frame_files = [unstarred_path, starred_path]
-                        frame_names = ["unstarred.png", "starred.png"]
-                        
-                        for i, frame_file in enumerate(frame_files):
-                            dest_path = os.path.join(debug_dir, frame_names[i])
-                            shutil.copy2(frame_file, dest_path)
+                        for render in renders:
+                            for frame_file in render["frames"]:
+                                dest_path = os.path.join(debug_dir, os.path.basename(frame_file))
+                                shutil.copy2(frame_file, dest_path)
                         
                         print(f"✅ Copied frames to {debug_dir}")
                     except PermissionError:
@@ -200,7 +244,111 @@ class RepoGifGenerator:
                 
             except Exception as e:
                 raise RuntimeError(f"Error generating GIF: {e}")
-
+        
+        if variants is not None:
+            return [render["out"] for render in renders]
+    
+    def _resolve_variants(self, out, variants):
+        """
+        Validate (width, height, scale, format) variants and derive their output paths.
+        
+        Returns:
+            list: One render description dict per variant
+            
+        Raises:
+            ValueError: If variants is empty, a variant is malformed, uses an unsupported
+                        format or two variants would write to the same path
+        """
+        if not variants:
+            raise ValueError("variants must not be empty")
+        base, _ = os.path.splitext(out)
+        renders = []
+        seen = set()
+        for variant in variants:
+            try:
+                v_width, v_height, v_scale, v_format = variant
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid variant {variant!r}: expected (width, height, scale, format)")
+            v_format = str(v_format).lower().lstrip(".")
+            if v_format not in _ANIMATION_FORMATS:
+                supported = ", ".join(_ANIMATION_FORMATS)
+                raise ValueError(f"Unsupported variant format '{v_format}'. Supported formats: {supported}")
+            if int(v_width) <= 0 or int(v_height) <= 0 or float(v_scale) <= 0:
+                raise ValueError(f"Invalid variant {variant!r}: width, height and scale must be positive")
+            
+            tag = f"_{int(v_width)}x{int(v_height)}"
+            if float(v_scale) != 1:
+                tag += f"@{float(v_scale):g}x"
+            v_out = f"{base}{tag}.{v_format}"
+            if v_out in seen:
+                raise ValueError(f"Duplicate variant {variant!r}")
+            seen.add(v_out)
+            
+            renders.append({"width": int(v_width), "height": int(v_height), "scale": float(v_scale),
+                            "format": v_format, "out": v_out, "tag": tag})
+        return renders
+    
+    def _capture_frames(self, browser, template_url, states, renders):
+        """
+        Screenshot every state of the template for every render.
+        
+        All renders share one browser context and page, so template assets (such as
+        template9's avatars) are fetched once per job. Each state is loaded once; the
+        other renders are captured from the loaded page by resizing the viewport,
+        updating the --gif-width/--gif-height CSS variables the templates size
+        themselves from and, for other scales, overriding the device scale factor
+        over CDP. Finite animations are left to finish after each load and screenshots
+        are taken with animations disabled, so all renders show the same frame.
+        """
+        first = renders[0]
+        context = browser.new_context(viewport={"width": first["width"], "height": first["height"]},
+                                      device_scale_factor=first["scale"])
+        try:
+            page = context.new_page()
+            # Only opened once a render needs a different scale than the context's
+            cdp = None
+            
+            for index, (state, state_params) in enumerate(states):
+                print(f"Capturing {state} state...")
+                if len(renders) > 1:
+                    self._set_viewport(page, cdp, first)
+                nav_params = dict(state_params, width=first["width"], height=first["height"])
+                query_string = "&".join([f"{k}={v}" for k, v in nav_params.items()])
+                page.goto(f"{template_url}?{query_string}")
+                page.evaluate(_SETTLE_ANIMATIONS)
+                
+                for render in renders:
+                    if render is not first:
+                        if cdp is None and render["scale"] != first["scale"]:
+                            cdp = context.new_cdp_session(page)
+                        self._set_viewport(page, cdp, render)
+                        self._restyle_page(page, render["width"], render["height"])
+                    # Freeze animations so every render shows the same moment
+                    page.screenshot(path=render["frames"][index], animations="disabled")
+        finally:
+            context.close()
+    
+    def _set_viewport(self, page, cdp, render):
+        """Resize the viewport and, with a CDP session, apply the render's device scale factor."""
+        page.set_viewport_size({"width": render["width"], "height": render["height"]})
+        if cdp is not None:
+            # Playwright resets the scale to the context's on every viewport change
+            cdp.send("Emulation.setDeviceMetricsOverride", {
+                "width": render["width"],
+                "height": render["height"],
+                "deviceScaleFactor": render["scale"],
+                "mobile": False
+            })
+    
+    def _restyle_page(self, page, width, height):
+        """Resize a loaded template to new dimensions without reloading it."""
+        page.evaluate(
+            """([width, height]) => {
+                document.documentElement.style.setProperty('--gif-width', `${width}px`);
+                document.documentElement.style.setProperty('--gif-height', `${height}px`);
+            }""",
+            [width, height]
+        )
 
 # Create a singleton instance of the generator
 _generator = RepoGifGenerator()
@@ -209,7 +357,8 @@ _generator = RepoGifGenerator()
 # Public API functions
 def generate_repo_gif(repo_name="repogif", stars=123, forks=45, out="repo.gif",
                      debug_dir=None, show_forks=True, template=None,
-                     width=580, height=140, contributors=None, commits=None):
+                     width=580, height=140, contributors=None, commits=None,
+                     variants=None):
     """
     Generate a GitHub repository header GIF using the specified template.
     
@@ -228,9 +377,11 @@ def generate_repo_gif(repo_name="repogif", stars=123, forks=45, out="repo.gif",
                                    Each contributor should have 'date', 'login', and 'avatar_url'.
         commits (str, optional): Comma-separated string of weekly commit counts for template8.
                               Example: "10,25,15,30,20,35,40"
+        variants (list, optional): List of (width, height, scale, format) tuples to render in a
+                                single browser session. See RepoGifGenerator.generate_gif.
         
     Returns:
-        None: The GIF is saved to the specified path
+        None/list: None, or the list of output paths when `variants` is given
     """
     return _generator.generate_gif(
         repo_name=repo_name,
@@ -243,7 +394,8 @@ def generate_repo_gif(repo_name="repogif", stars=123, forks=45, out="repo.gif",
         width=width,
         height=height,
         contributors=contributors,
-        commits=commits
+        commits=commits,
+        variants=variants
     )
 
 
@@ -0,0 +1,596 @@
+"""
+RepoGif - Queue-backed rendering across multiple worker nodes.
+
+Jobs are the keyword arguments of ``RepoGifGenerator.generate_gif`` and are
+keyed by a deterministic hash of those arguments, so enqueueing the same job
+twice is a no-op. Workers lease jobs for a visibility timeout; a lease that
+expires (e.g. because the worker node crashed) puts the job back on the queue
+until it runs out of attempts, at which point it is dead-lettered. Outputs are
+rendered to a temporary directory next to the destination and moved into place
+atomically, so a retried job never leaves a partial GIF behind.
+
+Two backends are provided:
+
+- ``SQLiteQueue``: a single SQLite file, suitable for workers on one host.
+- ``RedisQueue``: any Redis-compatible server (including local stand-ins),
+  suitable for workers spread over several machines.
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import socket
+import sqlite3
+import hashlib
+import tempfile
+
+from .generator import RepoGifGenerator
+
+
+# Arguments that do not affect the rendered output and are left out of the job key
+_UNHASHED_PARAMS = ("debug_dir",)
+
+
+def normalize_params(params):
+    """
+    Convert job parameters to the plain JSON form that is stored and later run.
+
+    Values JSON cannot represent (such as ``Path`` objects) become strings and
+    tuples become lists, so the hashed, stored and rendered params are identical.
+    """
+    return json.loads(json.dumps(params, default=str))
+
+
+def job_key(params):
+    """
+    Compute the deterministic key for a render job.
+
+    Args:
+        params (dict): Keyword arguments for ``RepoGifGenerator.generate_gif``.
+
+    Returns:
+        str: Hex SHA-256 digest of the canonicalised parameters.
+    """
+    params = normalize_params(params)
+    canonical = {k: v for k, v in params.items() if k not in _UNHASHED_PARAMS}
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteQueue:
+    """
+    Render queue stored in a single SQLite database file.
+
+    Every state transition happens inside an ``IMMEDIATE`` transaction, so any
+    number of worker processes on the same host can share one file.
+    """
+
+    def __init__(self, path, visibility_timeout=300, max_attempts=3):
+        """
+        Args:
+            path (str): Path to the SQLite database file. Created if missing.
+            visibility_timeout (float): Seconds a leased job stays invisible to
+                                        other workers before it is retried.
+            max_attempts (int): Number of leases a job gets before it is dead-lettered.
+        """
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " key TEXT PRIMARY KEY,"
+            " params TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " lease_until REAL,"
+            " token TEXT,"
+            " error TEXT,"
+            " created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_lease ON jobs (status, lease_until)")
+
+    def enqueue(self, params):
+        """
+        Add a job to the queue unless an identical job is already known.
+
+        Returns:
+            str: The job key.
+        """
+        params = normalize_params(params)
+        key = job_key(params)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO jobs (key, params, status, created) VALUES (?, ?, 'queued', ?)",
+            (key, json.dumps(params, sort_keys=True), time.time())
+        )
+        return key
+
+    def lease(self):
+        """
+        Lease the oldest available job.
+
+        Returns:
+            tuple/None: ``(key, params, token)`` or None if no job is available.
+        """
+        now = time.time()
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE jobs SET status = 'dead', token = NULL, error = 'lease expired' "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            # Two index lookups instead of an OR, which would sort the whole
+            # queue while holding the write lock
+            row = self._conn.execute(
+                "SELECT key, params FROM jobs WHERE status = 'leased' AND lease_until < ? "
+                "ORDER BY lease_until LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT key, params FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+                ).fetchone()
+            if row is None:
+                return None
+            token = uuid.uuid4().hex
+            self._conn.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, "
+                "lease_until = ?, token = ? WHERE key = ?",
+                (now + self.visibility_timeout, token, row[0])
+            )
+        return row[0], json.loads(row[1]), token
+
+    def complete(self, key, token):
+        """
+        Mark a leased job as done.
+
+        Returns:
+            bool: False if the lease had already expired and was handed to another worker.
+        """
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = 'done', token = NULL, lease_until = NULL "
+            "WHERE key = ? AND token = ?",
+            (key, token)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, key, token, error):
+        """
+        Record a failed attempt, requeueing the job or dead-lettering it.
+
+        Returns:
+            bool: False if the lease had already expired and was handed to another worker.
+        """
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'dead' ELSE 'queued' END, "
+            "token = NULL, lease_until = NULL, error = ? WHERE key = ? AND token = ?",
+            (self.max_attempts, str(error), key, token)
+        )
+        return cursor.rowcount == 1
+
+    def requeue_dead(self):
+        """
+        Put every dead-lettered job back on the queue with a fresh set of attempts.
+
+        Returns:
+            int: Number of jobs requeued.
+        """
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = 'queued', attempts = 0, error = NULL WHERE status = 'dead'"
+        )
+        return cursor.rowcount
+
+    def stats(self):
+        """Returns a dict mapping job status to the number of jobs in it."""
+        rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def dead_letters(self):
+        """Returns a list of ``(key, params, error)`` for dead-lettered jobs."""
+        rows = self._conn.execute(
+            "SELECT key, params, error FROM jobs WHERE status = 'dead' ORDER BY created"
+        ).fetchall()
+        return [(key, json.loads(params), error) for key, params, error in rows]
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._conn)
+
+
+class _ImmediateTransaction:
+    """Context manager running a block inside ``BEGIN IMMEDIATE``/``COMMIT``."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# Lua scripts keep every Redis state transition atomic, so a worker crashing
+# between two commands can never lose or duplicate a job. Every key a script
+# touches is passed in KEYS, and all keys share the ``{prefix}`` hash tag, so
+# the scripts also run on Redis Cluster and strict Redis-compatible servers.
+_REDIS_ENQUEUE = """
+if redis.call('HSETNX', KEYS[2], 'params', ARGV[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[2], 'status', 'queued', 'attempts', 0, 'created', ARGV[3])
+redis.call('RPUSH', KEYS[1], ARGV[2])
+return 1
+"""
+
+# Requeue (or dead-letter) one job whose lease has expired
+_REDIS_EXPIRE = """
+local deadline = redis.call('ZSCORE', KEYS[2], ARGV[1])
+if not deadline or tonumber(deadline) >= tonumber(ARGV[2]) then return 0 end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[1], 'token')
+if tonumber(redis.call('HGET', KEYS[1], 'attempts') or '0') >= tonumber(ARGV[3]) then
+    redis.call('HSET', KEYS[1], 'status', 'dead', 'error', 'lease expired')
+    redis.call('SADD', KEYS[4], ARGV[1])
+else
+    redis.call('HSET', KEYS[1], 'status', 'queued')
+    redis.call('RPUSH', KEYS[3], ARGV[1])
+end
+return 1
+"""
+
+# Move the oldest pending job into the leased set. Its job hash is only known
+# afterwards, so the lease is recorded on it by _REDIS_CLAIM; if a worker dies
+# in between, the job is still in the leased set and is requeued on expiry.
+_REDIS_POP = """
+local key = redis.call('LPOP', KEYS[1])
+if not key then return false end
+redis.call('ZADD', KEYS[2], ARGV[1], key)
+return key
+"""
+
+_REDIS_CLAIM = """
+if not redis.call('ZSCORE', KEYS[2], ARGV[1]) then return false end
+redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+redis.call('HSET', KEYS[1], 'status', 'leased', 'token', ARGV[2])
+return redis.call('HGET', KEYS[1], 'params')
+"""
+
+_REDIS_REQUEUE = """
+if redis.call('SREM', KEYS[2], ARGV[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[1], 'status', 'queued', 'attempts', 0)
+redis.call('HDEL', KEYS[1], 'error')
+redis.call('RPUSH', KEYS[3], ARGV[1])
+return 1
+"""
+
+_REDIS_COMPLETE = """
+if redis.call('HGET', KEYS[1], 'token') ~= ARGV[1] then return 0 end
+redis.call('ZREM', KEYS[2], ARGV[2])
+redis.call('HDEL', KEYS[1], 'token')
+redis.call('HSET', KEYS[1], 'status', 'done')
+return 1
+"""
+
+_REDIS_FAIL = """
+if redis.call('HGET', KEYS[1], 'token') ~= ARGV[1] then return 0 end
+redis.call('ZREM', KEYS[2], ARGV[2])
+redis.call('HDEL', KEYS[1], 'token')
+redis.call('HSET', KEYS[1], 'error', ARGV[4])
+if tonumber(redis.call('HGET', KEYS[1], 'attempts')) >= tonumber(ARGV[3]) then
+    redis.call('HSET', KEYS[1], 'status', 'dead')
+    redis.call('SADD', KEYS[4], ARGV[2])
+else
+    redis.call('HSET', KEYS[1], 'status', 'queued')
+    redis.call('RPUSH', KEYS[3], ARGV[2])
+end
+return 1
+"""
+
+
+class RedisQueue:
+    """
+    Render queue stored on a Redis-compatible server.
+
+    Layout (all keys under the ``{prefix}`` hash tag): a ``pending`` list of job
+    keys, a ``leased`` sorted set scored by lease deadline, a ``dead`` set, and
+    one ``job:<key>`` hash per job holding its params, status and attempt count.
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", prefix="repogif",
+                 visibility_timeout=300, max_attempts=3, client=None):
+        """
+        Args:
+            url (str): Redis connection URL. Ignored if ``client`` is given.
+            prefix (str): Namespace for all keys used by the queue.
+            visibility_timeout (float): Seconds a leased job stays invisible to
+                                        other workers before it is retried.
+            max_attempts (int): Number of leases a job gets before it is dead-lettered.
+            client (optional): An existing redis-py compatible client.
+
+        Raises:
+            RuntimeError: If the redis package is not installed and no client is given
+        """
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError(
+                    "Required dependencies not found. Please install with:\n"
+                    "pip install redis"
+                )
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.client = client
+        self.prefix = prefix
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._pending = f"{{{prefix}}}:pending"
+        self._leased = f"{{{prefix}}}:leased"
+        self._dead = f"{{{prefix}}}:dead"
+        self._job_prefix = f"{{{prefix}}}:job:"
+        self._enqueue = client.register_script(_REDIS_ENQUEUE)
+        self._expire = client.register_script(_REDIS_EXPIRE)
+        self._pop = client.register_script(_REDIS_POP)
+        self._claim = client.register_script(_REDIS_CLAIM)
+        self._requeue = client.register_script(_REDIS_REQUEUE)
+        self._complete = client.register_script(_REDIS_COMPLETE)
+        self._fail = client.register_script(_REDIS_FAIL)
+
+    def enqueue(self, params):
+        """
+        Add a job to the queue unless an identical job is already known.
+
+        Returns:
+            str: The job key.
+        """
+        params = normalize_params(params)
+        key = job_key(params)
+        self._enqueue(
+            keys=[self._pending, self._job_prefix + key],
+            args=[json.dumps(params, sort_keys=True), key, time.time()]
+        )
+        return key
+
+    def lease(self):
+        """
+        Lease the oldest available job.
+
+        Returns:
+            tuple/None: ``(key, params, token)`` or None if no job is available.
+        """
+        now = time.time()
+        for key in self.client.zrangebyscore(self._leased, "-inf", f"({now}"):
+            key = _decode(key)
+            self._expire(
+                keys=[self._job_prefix + key, self._leased, self._pending, self._dead],
+                args=[key, now, self.max_attempts]
+            )
+
+        while True:
+            key = self._pop(keys=[self._pending, self._leased],
+                            args=[now + self.visibility_timeout])
+            if not key:
+                return None
+            key = _decode(key)
+            token = uuid.uuid4().hex
+            params = self._claim(keys=[self._job_prefix + key, self._leased], args=[key, token])
+            if params:
+                return key, json.loads(_decode(params)), token
+
+    def complete(self, key, token):
+        """
+        Mark a leased job as done.
+
+        Returns:
+            bool: False if the lease had already expired and was handed to another worker.
+        """
+        return bool(self._complete(
+            keys=[self._job_prefix + key, self._leased],
+            args=[token, key]
+        ))
+
+    def fail(self, key, token, error):
+        """
+        Record a failed attempt, requeueing the job or dead-lettering it.
+
+        Returns:
+            bool: False if the lease had already expired and was handed to another worker.
+        """
+        return bool(self._fail(
+            keys=[self._job_prefix + key, self._leased, self._pending, self._dead],
+            args=[token, key, self.max_attempts, str(error)]
+        ))
+
+    def requeue_dead(self):
+        """
+        Put every dead-lettered job back on the queue with a fresh set of attempts.
+
+        Returns:
+            int: Number of jobs requeued.
+        """
+        requeued = 0
+        for key in self.client.smembers(self._dead):
+            key = _decode(key)
+            requeued += self._requeue(
+                keys=[self._job_prefix + key, self._dead, self._pending],
+                args=[key]
+            )
+        return requeued
+
+    def stats(self):
+        """Returns a dict mapping job status to the number of jobs in it."""
+        counts = {}
+        for job in self.client.scan_iter(match=f"{self._job_prefix}*"):
+            status = _decode(self.client.hget(job, "status"))
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def dead_letters(self):
+        """Returns a list of ``(key, params, error)`` for dead-lettered jobs."""
+        letters = []
+        for key in sorted(_decode(k) for k in self.client.smembers(self._dead)):
+            params, error = self.client.hmget(self._job_prefix + key, "params", "error")
+            letters.append((key, json.loads(_decode(params)), _decode(error)))
+        return letters
+
+    def close(self):
+        """Close the connection to the server."""
+        self.client.close()
+
+
+def _decode(value):
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def open_queue(url, **kwargs):
+    """
+    Open a render queue from a URL.
+
+    Args:
+        url (str): ``sqlite:///path/to/queue.db`` or ``redis://host:port/db``.
+        **kwargs: Passed to the backend (``visibility_timeout``, ``max_attempts``, ...).
+
+    Returns:
+        SQLiteQueue/RedisQueue: The opened queue.
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    if url.startswith("sqlite://"):
+        return SQLiteQueue(url[len("sqlite://"):], **kwargs)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisQueue(url, **kwargs)
+    raise ValueError(f"Unsupported queue URL '{url}'. Use sqlite:///path or redis://host:port/db")
+
+
+class RenderWorker:
+    """
+    Worker that leases jobs from a render queue and renders them.
+
+    Run one worker per process; throughput scales by starting more of them,
+    on the same host (SQLite or Redis) or on several hosts (Redis). While
+    running, the worker keeps one browser open and renders every job with it,
+    relaunching it if it dies.
+    """
+
+    def __init__(self, queue, generator=None, worker_id=None, poll_interval=1.0,
+                 launch_browser=None):
+        """
+        Args:
+            queue (SQLiteQueue/RedisQueue): Queue to lease jobs from.
+            generator (RepoGifGenerator, optional): Generator used to render jobs.
+            worker_id (str, optional): Name used in log output. Defaults to ``host:pid``.
+            poll_interval (float): Seconds to sleep when the queue is empty.
+            launch_browser (callable, optional): Returns a launched Playwright browser.
+                                                 Defaults to launching Chromium.
+        """
+        self.queue = queue
+        self.generator = generator or RepoGifGenerator()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.browser = None
+        self._launch_browser = launch_browser or self._launch_chromium
+        self._playwright = None
+
+    def process_one(self):
+        """
+        Lease and render a single job.
+
+        Returns:
+            bool: True if a job was leased, False if the queue was empty.
+        """
+        leased = self.queue.lease()
+        if leased is None:
+            return False
+        key, params, token = leased
+        print(f"[{self.worker_id}] Rendering job {key[:12]} -> {params.get('out', 'repo.gif')}")
+        try:
+            self._render(params, token)
+        except Exception as e:
+            self.queue.fail(key, token, e)
+            print(f"⚠️ [{self.worker_id}] Job {key[:12]} failed: {e}")
+            if self.browser is not None and not self.browser.is_connected():
+                print(f"[{self.worker_id}] Browser disconnected, relaunching")
+                self._close_browser()
+                self.browser = self._launch_browser()
+        else:
+            if not self.queue.complete(key, token):
+                print(f"⚠️ [{self.worker_id}] Lease on job {key[:12]} expired before completion")
+        return True
+
+    def run(self, max_jobs=None, exit_when_empty=False):
+        """
+        Process jobs until stopped.
+
+        Args:
+            max_jobs (int, optional): Stop after this many jobs.
+            exit_when_empty (bool): Stop as soon as the queue has no available job.
+
+        Returns:
+            int: Number of jobs processed.
+
+        Raises:
+            RuntimeError: If required dependencies are not available
+        """
+        self.browser = self._launch_browser()
+        try:
+            processed = 0
+            while max_jobs is None or processed < max_jobs:
+                if self.process_one():
+                    processed += 1
+                elif exit_when_empty:
+                    break
+                else:
+                    time.sleep(self.poll_interval)
+            return processed
+        finally:
+            self._close_browser()
+            if self._playwright is not None:
+                self._playwright.stop()
+                self._playwright = None
+
+    def _launch_chromium(self):
+        if self._playwright is None:
+            try:
+                from playwright.sync_api import sync_playwright
+            except ImportError:
+                raise RuntimeError(
+                    "Required dependencies not found. Please install with:\n"
+                    "pip install playwright pillow\n"
+                    "Then run: playwright install"
+                )
+            self._playwright = sync_playwright().start()
+        return self._playwright.chromium.launch()
+
+    def _close_browser(self):
+        if self.browser is None:
+            return
+        try:
+            self.browser.close()
+        except Exception:
+            # Already gone with the browser process
+            pass
+        self.browser = None
+
+    def _render(self, params, token):
+        """Render a job into a temporary directory and atomically move the outputs into place."""
+        out = os.path.abspath(params.get("out", "repo.gif"))
+        out_dir = os.path.dirname(out)
+        os.makedirs(out_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=f".repogif-{token}-", dir=out_dir)
+        try:
+            tmp_out = os.path.join(tmp_dir, os.path.basename(out))
+            outputs = self.generator.generate_gif(**dict(params, out=tmp_out), browser=self.browser)
+            for path in outputs or [tmp_out]:
+                os.replace(path, os.path.join(out_dir, os.path.basename(path)))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+__all__ = ['normalize_params', 'job_key', 'SQLiteQueue', 'RedisQueue', 'open_queue', 'RenderWorker']
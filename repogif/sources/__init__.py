@@ -0,0 +1,3 @@
+"""
+Data sources for RepoGif template parameters
+"""
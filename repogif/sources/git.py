@@ -0,0 +1,264 @@
+"""
+RepoGif - Build ``commits``/``contributors`` parameters from a local git clone.
+
+The history is read by streaming ``git log`` one commit at a time, so memory
+stays bounded by the number of weeks and authors rather than the number of
+commits. Both statistics are order-independent (a count per week and the
+earliest commit per author), so no sorting or ``--reverse`` buffering is needed.
+
+Results are cached per repository, keyed by HEAD. When HEAD moves forward only
+the new commits (``<cached HEAD>..HEAD``) are read; if history was rewritten
+the cache is rebuilt from scratch.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+
+SECONDS_PER_WEEK = 7 * 24 * 3600
+# The Unix epoch was a Thursday; shift by four days so weeks start on Monday
+_WEEK_OFFSET = 4 * 24 * 3600
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "repogif", "git"
+)
+
+# Bumped whenever the cache layout changes so stale caches are rebuilt
+_CACHE_VERSION = 1
+
+
+def week_start(timestamp):
+    """Returns the Unix timestamp of the Monday 00:00 UTC starting the week of ``timestamp``."""
+    return timestamp - (timestamp - _WEEK_OFFSET) % SECONDS_PER_WEEK
+
+
+def github_login(email):
+    """Returns the GitHub login encoded in a GitHub noreply address, or None."""
+    email = email.strip().lower()
+    if email.endswith("@users.noreply.github.com"):
+        return email.split("@")[0].split("+")[-1]
+    return None
+
+
+def avatar_url(name, email):
+    """
+    Guess an avatar URL for a commit author.
+
+    GitHub noreply addresses map to the user's GitHub avatar; any other address
+    falls back to a Gravatar identicon.
+    """
+    login = github_login(email)
+    if login:
+        return f"https://github.com/{login}.png"
+    email = email.strip().lower()
+    digest = hashlib.md5(email.encode("utf-8"), usedforsecurity=False).hexdigest()
+    return f"https://www.gravatar.com/avatar/{digest}?d=identicon"
+
+
+class GitHistory:
+    """
+    Weekly commit counts and first contributions of a local git repository.
+    """
+
+    def __init__(self, repo_path=".", cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Args:
+            repo_path (str): Path to a local clone (any directory inside the work tree).
+            cache_dir (str/None): Directory for the per-repository cache.
+                                  If None, nothing is cached.
+        """
+        self.repo_path = os.path.abspath(repo_path)
+        self.cache_dir = cache_dir
+        self.head = None
+        # week start timestamp -> number of commits
+        self.weeks = {}
+        # author email -> [name, first commit timestamp]
+        self.authors = {}
+
+    def update(self):
+        """
+        Bring the statistics up to date with the repository's HEAD.
+
+        Returns:
+            GitHistory: self, for chaining
+
+        Raises:
+            RuntimeError: If git is not available or the path is not a repository with commits
+        """
+        head = self._git("rev-parse", "HEAD").strip()
+        if self.head is None:
+            self._load_cache()
+        if self.head == head:
+            return self
+
+        if self.head is not None and self._is_ancestor(self.head, head):
+            revision_range = f"{self.head}..{head}"
+        else:
+            self.weeks, self.authors = {}, {}
+            revision_range = head
+
+        try:
+            self._scan(revision_range)
+        except Exception:
+            # A partial scan cannot be resumed; start from scratch next time
+            self.head, self.weeks, self.authors = None, {}, {}
+            raise
+        self.head = head
+        self._save_cache()
+        return self
+
+    def commits_param(self, weeks=12):
+        """
+        Build the ``commits`` parameter for template8.
+
+        Args:
+            weeks (int): Number of weeks to include, ending with the week of the latest commit.
+
+        Returns:
+            str: Comma-separated weekly commit counts, oldest week first.
+        """
+        if weeks < 1:
+            raise ValueError("weeks must be at least 1")
+        if not self.weeks:
+            return ",".join(["0"] * weeks)
+        last = max(self.weeks)
+        first = last - (weeks - 1) * SECONDS_PER_WEEK
+        return ",".join(
+            str(self.weeks.get(first + i * SECONDS_PER_WEEK, 0)) for i in range(weeks)
+        )
+
+    def contributors_param(self, limit=None):
+        """
+        Build the ``contributors`` parameter for template9.
+
+        Args:
+            limit (int, optional): Only include the most recent ``limit`` contributors.
+
+        Returns:
+            str: JSON list of contributors with 'login', 'avatar_url' and 'date'
+                 (first commit, YYYY-MM-DD), ordered by first commit. 'login' is the
+                 GitHub login for noreply addresses and the author name otherwise.
+        """
+        ordered = sorted(self.authors.items(), key=lambda item: (item[1][1], item[0]))
+        if limit is not None:
+            ordered = ordered[-limit:] if limit > 0 else []
+        contributors = [
+            {
+                "login": github_login(email) or name,
+                "avatar_url": avatar_url(name, email),
+                "date": datetime.fromtimestamp(first, tz=timezone.utc).strftime("%Y-%m-%d")
+            }
+            for email, (name, first) in ordered
+        ]
+        return json.dumps(contributors)
+
+    def _scan(self, revision_range):
+        """Stream ``git log`` over a revision range and fold each commit into the statistics."""
+        command = ["git", "-C", self.repo_path, "log", "--format=%at%x00%aN%x00%aE", revision_range]
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                       encoding="utf-8", errors="replace")
+        except FileNotFoundError:
+            raise RuntimeError("git executable not found. Please install git.")
+
+        weeks, authors = self.weeks, self.authors
+        try:
+            for line in process.stdout:
+                timestamp, name, email = line.rstrip("\n").split("\0", 2)
+                timestamp = int(timestamp)
+                week = week_start(timestamp)
+                weeks[week] = weeks.get(week, 0) + 1
+
+                key = email.lower() or name
+                author = authors.get(key)
+                if author is None:
+                    authors[key] = [name, timestamp]
+                elif timestamp < author[1]:
+                    author[1] = timestamp
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read()
+            process.wait()
+        if process.returncode != 0:
+            raise RuntimeError(f"git log failed in {self.repo_path}: {stderr.strip()}")
+
+    def _git(self, *args):
+        try:
+            result = subprocess.run(["git", "-C", self.repo_path] + list(args),
+                                    capture_output=True, encoding="utf-8", errors="replace")
+        except FileNotFoundError:
+            raise RuntimeError("git executable not found. Please install git.")
+        if result.returncode != 0:
+            raise RuntimeError(f"git {args[0]} failed in {self.repo_path}: {result.stderr.strip()}")
+        return result.stdout
+
+    def _is_ancestor(self, commit, head):
+        result = subprocess.run(["git", "-C", self.repo_path, "merge-base", "--is-ancestor", commit, head],
+                                capture_output=True)
+        return result.returncode == 0
+
+    def _cache_path(self):
+        key = hashlib.sha256(self.repo_path.encode("utf-8")).hexdigest()[:16]
+        name = os.path.basename(self.repo_path.rstrip(os.sep)) or "repo"
+        return os.path.join(self.cache_dir, f"{name}-{key}.json")
+
+    def _load_cache(self):
+        if self.cache_dir is None:
+            return
+        try:
+            with open(self._cache_path(), encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get("version") != _CACHE_VERSION:
+            return
+        self.head = cache["head"]
+        self.weeks = {int(week): count for week, count in cache["weeks"].items()}
+        self.authors = cache["authors"]
+
+    def _save_cache(self):
+        if self.cache_dir is None:
+            return
+        cache = {
+            "version": _CACHE_VERSION,
+            "repo": self.repo_path,
+            "head": self.head,
+            "weeks": self.weeks,
+            "authors": self.authors
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self._cache_path())
+        except OSError as e:
+            print(f"⚠️ Warning: Failed to write git history cache: {e}")
+
+
+def weekly_commits(repo_path=".", weeks=12, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Build template8's ``commits`` parameter from a local git clone.
+
+    Returns:
+        str: Comma-separated weekly commit counts, e.g. "10,25,15,30"
+    """
+    return GitHistory(repo_path, cache_dir=cache_dir).update().commits_param(weeks=weeks)
+
+
+def contributors(repo_path=".", limit=None, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Build template9's ``contributors`` parameter from a local git clone.
+
+    Returns:
+        str: JSON list of contributors with 'login', 'avatar_url' and 'date'
+    """
+    return GitHistory(repo_path, cache_dir=cache_dir).update().contributors_param(limit=limit)
+
+
+__all__ = ['GitHistory', 'weekly_commits', 'contributors', 'week_start', 'github_login', 'avatar_url']
@@ -0,0 +1,263 @@
+"""
+RepoGif - Watch mode for template development.
+
+Keeps a browser running, polls the template directories for changes and
+re-renders only the sample jobs of the templates that changed, so the preview
+of an edited template is ready a fraction of a second after saving it.
+"""
+
+import io
+import os
+import json
+import time
+import contextlib
+
+from .generator import RepoGifGenerator
+
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+DEFAULT_SAMPLES = os.path.join(TEMPLATES_DIR, "samples.json")
+
+
+def load_samples(path=DEFAULT_SAMPLES):
+    """
+    Load a sample manifest.
+
+    The manifest maps template names to lists of sample jobs. Each job has a
+    ``name`` (used for the preview file name) plus any ``generate_gif``
+    arguments. ``contributors`` may be given as a list and is JSON-encoded here.
+
+    Args:
+        path (str): Path to the manifest JSON file.
+
+    Returns:
+        dict: Mapping of template name to a list of ``(name, params)`` tuples.
+
+    Raises:
+        OSError: If the manifest cannot be read
+        ValueError: If the manifest is not valid JSON or not shaped as described
+    """
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict):
+        raise ValueError(f"Sample manifest {path} must map template names to lists of jobs")
+
+    samples = {}
+    for template_name, jobs in manifest.items():
+        if not isinstance(jobs, list) or not all(isinstance(job, dict) for job in jobs):
+            raise ValueError(f"Samples for '{template_name}' in {path} must be a list of objects")
+        samples[template_name] = []
+        for index, job in enumerate(jobs):
+            params = dict(job)
+            name = params.pop("name", f"sample{index + 1}")
+            if isinstance(params.get("contributors"), list):
+                params["contributors"] = json.dumps(params["contributors"])
+            samples[template_name].append((name, params))
+    return samples
+
+
+def snapshot_templates(template_names, templates_dir=TEMPLATES_DIR):
+    """
+    Record the modification time of every file in the given template directories.
+
+    Returns:
+        dict: Mapping of template name to a ``{path: mtime_ns}`` dict.
+    """
+    snapshot = {}
+    for template_name in template_names:
+        files = {}
+        for root, _, names in os.walk(os.path.join(templates_dir, template_name)):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    files[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    # File was removed between listing and stat
+                    continue
+        snapshot[template_name] = files
+    return snapshot
+
+
+def changed_templates(before, after):
+    """Returns the names of templates whose files differ between two snapshots."""
+    return [name for name in after if before.get(name) != after[name]]
+
+
+class TemplateWatcher:
+    """
+    Re-renders template previews whenever a template file changes.
+    """
+
+    def __init__(self, samples_path=DEFAULT_SAMPLES, out_dir="previews", templates=None,
+                 interval=0.2, generator=None):
+        """
+        Args:
+            samples_path (str, optional): Path to the sample manifest (see ``load_samples``).
+                                          Defaults to the manifest shipped with the templates.
+            out_dir (str): Directory previews are written to, one subdirectory per template.
+            templates (list, optional): Only watch these templates. Defaults to all
+                                        templates that have samples.
+            interval (float): Seconds between polls of the template directories.
+            generator (RepoGifGenerator, optional): Generator used to render previews. The
+                                                  templates in its ``templates_dir`` are watched.
+
+        Raises:
+            ValueError: If a requested template does not exist or has no samples
+        """
+        self.samples_path = samples_path or DEFAULT_SAMPLES
+        self.out_dir = out_dir
+        self.interval = interval
+        self.generator = generator or RepoGifGenerator()
+        self.templates_dir = self.generator.templates_dir
+        self._only = templates
+        self.samples = self._load_samples()
+        # Set while run() is active
+        self.browser = None
+        self._chromium = None
+
+    def _load_samples(self):
+        samples = load_samples(self.samples_path)
+        available = self.generator.get_available_templates()
+        for name in self._only or []:
+            if name not in available:
+                raise ValueError(f"Template '{name}' not found. Available templates: {', '.join(available)}")
+            if not samples.get(name):
+                raise ValueError(f"Template '{name}' has no samples in {self.samples_path}")
+        return {
+            name: jobs for name, jobs in samples.items()
+            if name in available and (not self._only or name in self._only)
+        }
+
+    def reload_samples(self):
+        """
+        Reload the sample manifest, keeping the previous samples if it is unreadable.
+
+        Returns:
+            bool: True if the samples were reloaded.
+        """
+        try:
+            self.samples = self._load_samples()
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Warning: Keeping previous samples, failed to load {self.samples_path}: {e}")
+            return False
+        return True
+
+    def _manifest_mtime(self):
+        try:
+            return os.stat(self.samples_path).st_mtime_ns
+        except OSError:
+            # Missing while an editor replaces it; reloaded once it reappears
+            return None
+
+    def render_template(self, template_name):
+        """
+        Render every sample job of a template with the watcher's browser.
+
+        If a render fails because the browser died, the browser is relaunched
+        and the sample is rendered once more.
+
+        Returns:
+            int: Number of previews written.
+        """
+        rendered = 0
+        for name, params in self.samples.get(template_name, []):
+            out = os.path.join(self.out_dir, template_name, f"{name}.gif")
+            os.makedirs(os.path.dirname(out), exist_ok=True)
+            for attempt in range(2):
+                started = time.perf_counter()
+                try:
+                    # The generator's progress output would drown the timings
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        self.generator.generate_gif(**dict(params, template=template_name, out=out),
+                                                    browser=self.browser)
+                except Exception as e:
+                    print(f"⚠️ {template_name}/{name}: {e}")
+                    if attempt == 0 and not self.browser.is_connected():
+                        print("Browser disconnected, relaunching...")
+                        self._relaunch_browser()
+                        continue
+                    break
+                total = time.perf_counter() - started
+                stages = ", ".join(f"{stage} {seconds:.2f}s"
+                                   for stage, seconds in self.generator.last_timings.items())
+                print(f"✅ {template_name}/{name}: {stages}, total {total:.2f}s -> {out}")
+                rendered += 1
+                break
+        return rendered
+
+    def render(self, template_names):
+        """Render the samples of several templates and print the overall turnaround."""
+        started = time.perf_counter()
+        rendered = sum(self.render_template(name) for name in template_names)
+        print(f"Rendered {rendered} preview(s) in {time.perf_counter() - started:.2f}s")
+
+    def _relaunch_browser(self):
+        try:
+            self.browser.close()
+        except Exception:
+            # Already gone with the browser process
+            pass
+        self.browser = self._launch_browser()
+
+    def _launch_browser(self):
+        try:
+            return self._chromium.launch()
+        except Exception as e:
+            raise RuntimeError(f"Failed to launch browser: {e}")
+
+    def run(self, once=False):
+        """
+        Render all previews, then re-render changed templates until interrupted.
+
+        Args:
+            once (bool): Render all previews once and return instead of watching.
+
+        Raises:
+            RuntimeError: If required dependencies are not available
+        """
+        try:
+            from playwright.sync_api import sync_playwright
+        except ImportError:
+            raise RuntimeError(
+                "Required dependencies not found. Please install with:\n"
+                "pip install playwright pillow\n"
+                "Then run: playwright install"
+            )
+
+        with sync_playwright() as p:
+            self._chromium = p.chromium
+            self.browser = self._launch_browser()
+            try:
+                snapshot = snapshot_templates(self.samples, self.templates_dir)
+                manifest_mtime = self._manifest_mtime()
+                self.render(list(self.samples))
+                if once:
+                    return
+
+                print(f"Watching {len(self.samples)} template(s) in {self.templates_dir} (Ctrl+C to stop)")
+                while True:
+                    time.sleep(self.interval)
+
+                    current_mtime = self._manifest_mtime()
+                    if current_mtime != manifest_mtime:
+                        manifest_mtime = current_mtime
+                        if not self.reload_samples():
+                            continue
+                        print("Sample manifest changed, re-rendering all previews...")
+                        snapshot = snapshot_templates(self.samples, self.templates_dir)
+                        self.render(list(self.samples))
+                        continue
+
+                    current = snapshot_templates(self.samples, self.templates_dir)
+                    changed = changed_templates(snapshot, current)
+                    snapshot = current
+                    if changed:
+                        print(f"Changed: {', '.join(changed)}")
+                        self.render(changed)
+            except KeyboardInterrupt:
+                print("Stopped watching")
+            finally:
+                self.browser.close()
+                self.browser = None
+
+__all__ = ['load_samples', 'snapshot_templates', 'changed_templates', 'TemplateWatcher']
@@ -20,6 +20,9 @@ setup(
         "numpy",
         "playwright"
     ],
+    extras_require={
+        "redis": ["redis"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -29,7 +32,7 @@ setup(
     long_description_content_type="text/markdown",
     entry_points={
         "console_scripts": [
-            "repogif=repogif.generator:generate_repo_gif",
+            "repogif=repogif.cli:main",
         ],
     },
 )
\ No newline at end of file
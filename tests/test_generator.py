@@ -1,7 +1,120 @@
-from repogif.generator import generate_repo_gif
 import os
+import pytest
+from PIL import Image
+from repogif.generator import generate_repo_gif, RepoGifGenerator
 
 def test_generate():
     out_file = "test.gif"
     generate_repo_gif(repo_name="testrepo", stars=5, forks=2, out=out_file)
-    assert os.path.exists(out_file)
\ No newline at end of file
+    assert os.path.exists(out_file)
+
+def test_resolve_variants():
+    generator = RepoGifGenerator()
+    renders = generator._resolve_variants("out/repo.gif", [(580, 140, 1, "gif"), (1200, 630, 2, "PNG")])
+    assert [r["out"] for r in renders] == ["out/repo_580x140.gif", "out/repo_1200x630@2x.png"]
+    with pytest.raises(ValueError):
+        generator._resolve_variants("repo.gif", [(580, 140, 1, "bmp")])
+    with pytest.raises(ValueError):
+        generator._resolve_variants("repo.gif", [(580, 140, 1, "gif"), (580, 140, 1.0, "gif")])
+    with pytest.raises(ValueError, match="must not be empty"):
+        generator._resolve_variants("repo.gif", [])
+
+
+class FakePage:
+    """
+    Mimics Playwright: viewport changes reset the scale to the context's, and
+    animations keep running (one step per call) unless settled and disabled.
+    """
+
+    def __init__(self, context):
+        self.context = context
+        self.size = dict(context.viewport)
+        self.scale = context.scale
+        self.clock = 0
+        self.settled = False
+
+    def set_viewport_size(self, size):
+        self.context.calls.append("set_viewport_size")
+        self.size = dict(size)
+        self.scale = self.context.scale
+        self.clock += 1
+
+    def goto(self, url):
+        self.context.calls.append("goto")
+        self.clock = 0
+        self.settled = False
+
+    def evaluate(self, script, args=None):
+        if "getAnimations" in script:
+            self.settled = True
+        self.clock += 1
+
+    def screenshot(self, path, animations=None):
+        size = (int(self.size["width"] * self.scale), int(self.size["height"] * self.scale))
+        frozen = self.settled and animations == "disabled"
+        Image.new("L", size, 255 if frozen else self.clock).save(path)
+
+
+class FakeCDPSession:
+    def __init__(self, page):
+        self.page = page
+
+    def send(self, method, params):
+        self.page.scale = params["deviceScaleFactor"]
+
+
+class FakeContext:
+    def __init__(self, calls, viewport, device_scale_factor):
+        self.calls, self.viewport, self.scale = calls, viewport, device_scale_factor
+
+    def new_page(self):
+        self.calls.append("new_page")
+        return FakePage(self)
+
+    def new_cdp_session(self, page):
+        return FakeCDPSession(page)
+
+    def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.calls = []
+
+    def new_context(self, viewport, device_scale_factor=1):
+        self.calls.append("new_context")
+        return FakeContext(self.calls, viewport, device_scale_factor)
+
+
+def test_variants_share_one_page(tmp_path):
+    browser = FakeBrowser()
+    outputs = RepoGifGenerator().generate_gif(
+        out=str(tmp_path / "repo.gif"),
+        variants=[(1200, 630, 1, "png"), (580, 140, 2, "gif"), (580, 140, 1, "gif")],
+        browser=browser
+    )
+
+    assert [os.path.basename(path) for path in outputs] == [
+        "repo_1200x630.png", "repo_580x140@2x.gif", "repo_580x140.gif"
+    ]
+    assert browser.calls.count("new_context") == 1
+    assert browser.calls.count("new_page") == 1
+    assert browser.calls.count("goto") == 2
+    assert browser.calls.count("set_viewport_size") == 6
+    assert Image.open(outputs[1]).size == (1160, 280)
+    assert Image.open(outputs[2]).size == (580, 140)
+
+
+def test_variants_capture_the_same_animation_frame(tmp_path):
+    outputs = RepoGifGenerator().generate_gif(
+        out=str(tmp_path / "repo.png"),
+        variants=[(580, 140, 1, "png"), (1200, 630, 1, "png"), (580, 140, 2, "png")],
+        browser=FakeBrowser(),
+        debug_dir=str(tmp_path / "frames")
+    )
+
+    assert len(outputs) == 3
+    frames = sorted((tmp_path / "frames").iterdir())
+    assert len(frames) == 6
+    assert {Image.open(frame).getpixel((0, 0)) for frame in frames} == {255}
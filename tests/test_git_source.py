@@ -0,0 +1,69 @@
+import os
+import json
+import subprocess
+from repogif.sources.git import GitHistory, week_start, SECONDS_PER_WEEK
+
+MONDAY = 1704067200  # 2024-01-01 00:00 UTC
+
+
+def commit(repo, author, email, timestamp, amend=False):
+    env = dict(os.environ, GIT_AUTHOR_NAME=author, GIT_AUTHOR_EMAIL=email, GIT_AUTHOR_DATE=f"{timestamp} +0000",
+               GIT_COMMITTER_NAME=author, GIT_COMMITTER_EMAIL=email, GIT_COMMITTER_DATE=f"{timestamp} +0000")
+    command = ["git", "-C", str(repo), "commit", "-q", "--allow-empty", "-m", "c"]
+    if amend:
+        command += ["--amend", "--reset-author"]
+    subprocess.run(command, env=env, check=True)
+
+
+def test_week_start():
+    assert week_start(MONDAY) == MONDAY
+    assert week_start(MONDAY + SECONDS_PER_WEEK - 1) == MONDAY
+
+
+def head(repo):
+    return subprocess.run(["git", "-C", str(repo), "rev-parse", "HEAD"],
+                          capture_output=True, text=True, check=True).stdout.strip()
+
+
+def test_incremental_history(tmp_path, monkeypatch):
+    scanned = []
+    original_scan = GitHistory._scan
+
+    def spy_scan(self, revision_range):
+        scanned.append(revision_range)
+        return original_scan(self, revision_range)
+
+    monkeypatch.setattr(GitHistory, "_scan", spy_scan)
+
+    repo = tmp_path / "repo"
+    subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    commit(repo, "alice", "alice@example.com", MONDAY + 3600)
+    commit(repo, "Bob Builder", "123+bob@users.noreply.github.com", MONDAY + 3 * 86400)
+    commit(repo, "alice", "alice@example.com", MONDAY + 2 * SECONDS_PER_WEEK)
+    first_head = head(repo)
+
+    cache_dir = tmp_path / "cache"
+    history = GitHistory(str(repo), cache_dir=str(cache_dir)).update()
+    assert history.commits_param(weeks=4) == "0,2,0,1"
+    assert scanned == [first_head]
+
+    commit(repo, "carol", "carol@example.com", MONDAY + 3 * SECONDS_PER_WEEK)
+    second_head = head(repo)
+    history = GitHistory(str(repo), cache_dir=str(cache_dir)).update()
+    assert history.commits_param(weeks=4) == "2,0,1,1"
+    assert scanned[1] == f"{first_head}..{second_head}"
+
+    history.update()
+    assert len(scanned) == 2
+
+    contributors = json.loads(history.contributors_param())
+    assert [c["login"] for c in contributors] == ["alice", "bob", "carol"]
+    assert contributors[0]["date"] == "2024-01-01"
+    assert contributors[1]["avatar_url"] == "https://github.com/bob.png"
+
+    # Rewriting history forces a full rebuild
+    commit(repo, "dave", "dave@example.com", MONDAY + 3 * SECONDS_PER_WEEK, amend=True)
+    history = GitHistory(str(repo), cache_dir=str(cache_dir)).update()
+    assert scanned[2] == head(repo)
+    assert history.commits_param(weeks=4) == "2,0,1,1"
+    assert [c["login"] for c in json.loads(history.contributors_param())] == ["alice", "bob", "dave"]
@@ -0,0 +1,157 @@
+import os
+import pytest
+from repogif.render_queue import SQLiteQueue, RedisQueue, RenderWorker, job_key
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_queue(request, tmp_path):
+    """Returns a factory for empty queues on each backend."""
+    if request.param == "sqlite":
+        return lambda **kwargs: SQLiteQueue(str(tmp_path / "jobs.db"), **kwargs)
+
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    return lambda **kwargs: RedisQueue(
+        client=fakeredis.FakeRedis(server=server, decode_responses=True), **kwargs
+    )
+
+
+def test_enqueue_is_idempotent(make_queue):
+    queue = make_queue()
+    params = {"repo_name": "testrepo", "stars": 5, "out": "test.gif"}
+    assert queue.enqueue(params) == queue.enqueue(dict(params)) == job_key(params)
+    assert queue.stats() == {"queued": 1}
+
+
+def test_enqueue_stores_what_is_hashed(make_queue, tmp_path):
+    queue = make_queue()
+    key = queue.enqueue({"repo_name": "testrepo", "out": tmp_path / "test.gif",
+                         "variants": [(580, 140, 1, "gif")]})
+    assert key == job_key({"repo_name": "testrepo", "out": str(tmp_path / "test.gif"),
+                           "variants": [[580, 140, 1, "gif"]]})
+
+    _, params, _ = queue.lease()
+    assert params["out"] == str(tmp_path / "test.gif")
+    assert job_key(params) == key
+
+
+def test_expired_lease_is_retried_then_dead_lettered(make_queue):
+    queue = make_queue(visibility_timeout=-1, max_attempts=2)
+    key = queue.enqueue({"repo_name": "testrepo", "out": "test.gif"})
+
+    _, _, first_token = queue.lease()
+    _, _, second_token = queue.lease()
+    assert not queue.complete(key, first_token)
+    assert queue.lease() is None
+    assert queue.stats() == {"dead": 1}
+    assert not queue.complete(key, second_token)
+
+
+def test_failed_job_is_requeued(make_queue):
+    queue = make_queue(max_attempts=2)
+    key = queue.enqueue({"repo_name": "testrepo", "out": "test.gif"})
+
+    _, _, token = queue.lease()
+    assert queue.fail(key, token, "boom")
+    _, params, token = queue.lease()
+    assert params["repo_name"] == "testrepo"
+    assert queue.complete(key, token)
+    assert queue.stats() == {"done": 1}
+
+
+def test_dead_letters_can_be_requeued(make_queue):
+    queue = make_queue(max_attempts=1)
+    key = queue.enqueue({"repo_name": "testrepo", "out": "test.gif"})
+
+    _, _, token = queue.lease()
+    queue.fail(key, token, "boom")
+    assert [letter[0] for letter in queue.dead_letters()] == [key]
+    assert queue.requeue_dead() == 1
+    assert queue.stats() == {"queued": 1}
+
+    _, _, token = queue.lease()
+    assert queue.complete(key, token)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        self.closed = True
+
+
+def launcher(browsers):
+    """Returns a launch_browser callable that records every FakeBrowser it launches."""
+    def launch():
+        browsers.append(FakeBrowser())
+        return browsers[-1]
+    return launch
+
+
+class StubGenerator:
+    """Writes placeholder outputs instead of rendering, failing or crashing the browser on request."""
+
+    def __init__(self):
+        self.browsers = []
+
+    def generate_gif(self, out, browser=None, fail=False, crash=False, variants=None, **kwargs):
+        self.browsers.append(browser)
+        if crash:
+            browser.connected = False
+            raise RuntimeError("browser closed")
+        if fail:
+            raise RuntimeError("render failed")
+        if variants is None:
+            outputs = [out]
+        else:
+            base = os.path.splitext(out)[0]
+            outputs = [f"{base}_{w}x{h}.{fmt}" for w, h, scale, fmt in variants]
+        for path in outputs:
+            with open(path, "w") as f:
+                f.write("gif")
+        return outputs if variants is not None else None
+
+
+def test_worker_moves_outputs_into_place(tmp_path):
+    queue = SQLiteQueue(str(tmp_path / "jobs.db"), max_attempts=1)
+    out_dir = tmp_path / "out"
+    queue.enqueue({"out": str(out_dir / "a.gif")})
+    queue.enqueue({"out": str(out_dir / "b.gif"), "variants": [[100, 50, 1, "gif"], [200, 100, 1, "png"]]})
+    failing = queue.enqueue({"out": str(out_dir / "c.gif"), "fail": True})
+
+    browsers = []
+    worker = RenderWorker(queue, generator=StubGenerator(),
+                          launch_browser=launcher(browsers))
+    assert worker.run(exit_when_empty=True) == 3
+    assert len(browsers) == 1 and browsers[0].closed
+
+    assert sorted(os.listdir(out_dir)) == ["a.gif", "b_100x50.gif", "b_200x100.png"]
+    assert queue.stats() == {"done": 2, "dead": 1}
+    assert queue.dead_letters() == [(failing, {"out": str(out_dir / "c.gif"), "fail": True},
+                                     "render failed")]
+
+
+def test_worker_reuses_browser_and_relaunches_after_crash(tmp_path):
+    queue = SQLiteQueue(str(tmp_path / "jobs.db"), max_attempts=1)
+    out_dir = tmp_path / "out"
+    queue.enqueue({"out": str(out_dir / "a.gif")})
+    queue.enqueue({"out": str(out_dir / "b.gif")})
+    queue.enqueue({"out": str(out_dir / "c.gif"), "crash": True})
+    queue.enqueue({"out": str(out_dir / "d.gif")})
+
+    browsers = []
+    generator = StubGenerator()
+    worker = RenderWorker(queue, generator=generator,
+                          launch_browser=launcher(browsers))
+    assert worker.run(exit_when_empty=True) == 4
+
+    assert len(browsers) == 2
+    assert generator.browsers == [browsers[0]] * 3 + [browsers[1]]
+    assert all(browser.closed for browser in browsers)
+    assert queue.stats() == {"done": 3, "dead": 1}
@@ -0,0 +1,90 @@
+import os
+import json
+import pytest
+from repogif.generator import RepoGifGenerator
+from repogif.watch import load_samples, snapshot_templates, changed_templates, TemplateWatcher, TEMPLATES_DIR
+
+
+def test_samples_cover_all_templates():
+    samples = load_samples()
+    for template_name in os.listdir(TEMPLATES_DIR):
+        if template_name.startswith("template"):
+            assert samples[template_name]
+    name, params = samples["template9"][0]
+    assert isinstance(params["contributors"], str)
+
+
+def test_changed_templates(tmp_path):
+    for template_name in ("template1", "template2"):
+        (tmp_path / template_name).mkdir()
+        (tmp_path / template_name / "template.html").write_text("<html></html>")
+    before = snapshot_templates(["template1", "template2"], str(tmp_path))
+
+    html = tmp_path / "template2" / "template.html"
+    os.utime(html, ns=(0, 0))
+    after = snapshot_templates(["template1", "template2"], str(tmp_path))
+    assert changed_templates(before, after) == ["template2"]
+
+
+def test_unknown_template_is_rejected():
+    with pytest.raises(ValueError, match="Available templates"):
+        TemplateWatcher(templates=["template99"])
+
+
+def test_invalid_manifest_keeps_previous_samples(tmp_path):
+    manifest = tmp_path / "samples.json"
+    manifest.write_text(json.dumps({"template1": [{"name": "default", "stars": "1k"}]}))
+    watcher = TemplateWatcher(samples_path=str(manifest))
+
+    manifest.write_text('{"template1": [')
+    assert not watcher.reload_samples()
+    manifest.unlink()
+    assert not watcher.reload_samples()
+    assert watcher.samples == {"template1": [("default", {"stars": "1k"})]}
+
+
+def test_watches_the_generators_templates(tmp_path):
+    watcher = TemplateWatcher(generator=RepoGifGenerator(templates_dir=str(tmp_path)))
+    assert watcher.templates_dir == str(tmp_path)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def launch(self):
+        return FakeBrowser()
+
+
+class CrashingGenerator(RepoGifGenerator):
+    """Crashes the first browser it renders with, then succeeds."""
+
+    def __init__(self):
+        super().__init__()
+        self.browsers = []
+
+    def generate_gif(self, browser=None, **kwargs):
+        self.browsers.append(browser)
+        if len(self.browsers) == 1:
+            browser.connected = False
+            raise RuntimeError("Target page, context or browser has been closed")
+
+
+def test_dead_browser_is_relaunched(tmp_path):
+    generator = CrashingGenerator()
+    watcher = TemplateWatcher(out_dir=str(tmp_path), templates=["template2"], generator=generator)
+    watcher._chromium = FakeChromium()
+    watcher.browser = FakeBrowser()
+    first_browser = watcher.browser
+
+    assert watcher.render_template("template2") == 1
+    assert generator.browsers == [first_browser, watcher.browser]
+    assert watcher.browser is not first_browser and watcher.browser.is_connected()